@@ -0,0 +1,64 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional C fast path for json_logger: builds one NDJSON sample line per call
+in a stack buffer, with no intermediate Python objects.
+
+Build in place (json_logger falls back to pure Python when this isn't built):
+  cythonize -i _fastlog.pyx
+
+Output must stay byte-for-byte identical to PinSampleJSONLogger's pure-Python path.
+"""
+
+from cpython.bytes cimport PyBytes_FromStringAndSize
+from libc.stdio cimport snprintf
+from libc.string cimport memcpy
+
+
+cdef inline void _civil_from_days(long long z, int *y, int *m, int *d) noexcept:
+    # days since 1970-01-01 -> proleptic Gregorian date (H. Hinnant's algorithm);
+    # avoids gmtime(), whose reentrant form differs between platforms
+    cdef long long era, doe, yoe, doy, mp
+    z += 719468
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    d[0] = <int>(doy - (153 * mp + 2) // 5 + 1)
+    m[0] = <int>(mp + 3 if mp < 10 else mp - 9)
+    y[0] = <int>(yoe + era * 400 + (1 if m[0] <= 2 else 0))
+
+
+cdef inline int _put_pin(char *out, int n, int mask, int bit) noexcept:
+    # one pin value: presence bit (4 + bit) and value bit (bit), see serial_reader.PinStates
+    if mask & (0x10 << bit):
+        out[n] = 49 if mask & (1 << bit) else 48  # '1' / '0'
+        return n + 1
+    memcpy(out + n, b"null", 4)
+    return n + 4
+
+
+def encode_sample(long long ts_us, int mask):
+    """NDJSON line (with trailing newline) for epoch-microsecond ts_us and a PinStates mask."""
+    cdef char buf[128]
+    cdef long long secs = ts_us // 1000000
+    cdef long long days = secs // 86400
+    cdef int sod = <int>(secs - days * 86400)
+    cdef int us = <int>(ts_us - secs * 1000000)
+    cdef int y, mo, d, n
+
+    _civil_from_days(days, &y, &mo, &d)
+    n = snprintf(
+        buf, 64, b'{"ts_utc":"%04d-%02d-%02dT%02d:%02d:%02d.%06dZ"',
+        y, mo, d, <int>(sod // 3600), <int>((sod // 60) % 60), <int>(sod % 60), us,
+    )
+    memcpy(buf + n, b',"d4":', 6)
+    n = _put_pin(buf, n + 6, mask, 0)
+    memcpy(buf + n, b',"d5":', 6)
+    n = _put_pin(buf, n + 6, mask, 1)
+    memcpy(buf + n, b',"d6":', 6)
+    n = _put_pin(buf, n + 6, mask, 2)
+    memcpy(buf + n, b',"d7":', 6)
+    n = _put_pin(buf, n + 6, mask, 3)
+    memcpy(buf + n, b"}\n", 2)
+    return PyBytes_FromStringAndSize(buf, n + 2)
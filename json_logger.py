@@ -2,17 +2,54 @@ from __future__ import annotations
 
 import json
 import os
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Optional, TextIO
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
+
+try:
+    from _fastlog import encode_sample
+except ImportError:  # optional C fast path, see _fastlog.pyx (cythonize -i _fastlog.pyx)
+    encode_sample = None
 
 from serial_reader import PinStates
 
 
+def _dumps(rec: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(rec)
+    return json.dumps(rec, separators=(",", ":")).encode("utf-8")
+
+
+# Fixed-schema fast path: keys/order never change and pin values are 0/1/None,
+# so a line is just prefix + timestamp + the tail for the pin mask. There are only
+# 256 masks (see PinStates), so every tail is rendered once up front.
+_PREFIX = b'{"ts_utc":"'
+
+
+def _pin_tail(mask: int) -> bytes:
+    vals = []
+    for bit in range(4):
+        if mask & (0x10 << bit):
+            vals.append(b"1" if mask & (1 << bit) else b"0")
+        else:
+            vals.append(b"null")
+    return b'","d4":%s,"d5":%s,"d6":%s,"d7":%s}\n' % tuple(vals)
+
+
+_TAILS = tuple(_pin_tail(m) for m in range(256))
+
+
 @dataclass(frozen=True)
 class JSONLogConfig:
     path: str = "pin_samples.ndjson"
-    flush_every: int = 1  # flush every N records (1 = always)
+    buffer_bytes: int = 65536  # write the batch once it reaches this many bytes
+    flush_interval_s: float = 0.5  # ...or once this long has passed since the last write
+    fsync_interval_s: float = 5.0  # fsync at most this often (0 = only on close)
 
 
 class PinSampleJSONLogger:
@@ -22,26 +59,65 @@ class PinSampleJSONLogger:
     Output format: NDJSON (newline-delimited JSON)
     Example line:
       {"ts_utc":"2026-01-13T04:32:10.123456Z","d4":0,"d5":1,"d6":0,"d7":0}
+
+    Lines are batched in memory and written out when the batch reaches
+    cfg.buffer_bytes or cfg.flush_interval_s has elapsed; close() drains it.
+    Both limits are checked on each write, so a caller that can go idle should
+    also call flush() once flush_interval_s passes without writes (the logging
+    service does).
+
+    Written batches are left to the OS page cache and only fsync'd every
+    cfg.fsync_interval_s (and on close), so a power failure can lose up to that
+    window of samples. That's the intended tradeoff for high-rate telemetry.
     """
 
     def __init__(self, cfg: JSONLogConfig = JSONLogConfig()) -> None:
         self.cfg = cfg
-        self._fh: Optional[TextIO] = None
-        self._count_since_flush = 0
+        self._fd: Optional[int] = None
+        self._buf = bytearray()
+        self._last_flush = time.monotonic()
+        self._last_fsync = time.monotonic()
 
     def open(self) -> None:
-        if self._fh:
+        if self._fd is not None:
             return
         os.makedirs(os.path.dirname(self.cfg.path) or ".", exist_ok=True)
-        self._fh = open(self.cfg.path, "a", encoding="utf-8", newline="\n")
+        # raw fd, no Python-level buffering: self._buf is the buffer, each batch is one os.write
+        flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        self._fd = os.open(self.cfg.path, flags, 0o644)
+        self._last_flush = self._last_fsync = time.monotonic()
+
+    def flush(self) -> None:
+        if self._fd is not None and self._buf:
+            written = 0
+            try:
+                with memoryview(self._buf) as view:
+                    while written < len(view):
+                        written += os.write(self._fd, view[written:])
+            except BaseException:
+                # keep only what didn't reach the file, so the next flush never repeats a
+                # prefix; copy rather than resize, the failed call may still hold an export
+                self._buf = self._buf[written:]
+                raise
+            self._buf.clear()
+        self._last_flush = now = time.monotonic()
+        if (
+            self._fd is not None
+            and self.cfg.fsync_interval_s > 0
+            and now - self._last_fsync >= self.cfg.fsync_interval_s
+        ):
+            os.fsync(self._fd)
+            self._last_fsync = now
 
     def close(self) -> None:
-        if self._fh:
+        if self._fd is not None:
             try:
-                self._fh.flush()
-                self._fh.close()
+                self.flush()
+                os.fsync(self._fd)
             finally:
-                self._fh = None
+                os.close(self._fd)
+                self._fd = None
+                self._buf.clear()
 
     def __enter__(self) -> "PinSampleJSONLogger":
         self.open()
@@ -50,25 +126,58 @@ class PinSampleJSONLogger:
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
 
+    @staticmethod
+    def iso_utc(ts_us: int) -> str:
+        # ISO-8601 UTC with a "Z" suffix and fixed microsecond precision,
+        # formatted directly instead of building a datetime for every sample
+        s, us = divmod(ts_us, 1_000_000)
+        tm = time.gmtime(s)
+        return "%04d-%02d-%02dT%02d:%02d:%02d.%06dZ" % (
+            tm.tm_year, tm.tm_mon, tm.tm_mday, tm.tm_hour, tm.tm_min, tm.tm_sec, us
+        )
+
     @staticmethod
     def now_iso_utc() -> str:
-        return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        return PinSampleJSONLogger.iso_utc(time.time_ns() // 1000)
 
     def write_sample(self, states: PinStates, ts_utc: Optional[str] = None) -> None:
-        if not self._fh:
+        if self._fd is None:
             raise RuntimeError("JSON logger is not open. Call open() first.")
-
-        rec = {
-            "ts_utc": ts_utc or self.now_iso_utc(),
-            "d4": states.d4,
-            "d5": states.d5,
-            "d6": states.d6,
-            "d7": states.d7,
-        }
-
-        self._fh.write(json.dumps(rec, separators=(",", ":")) + "\n")
-
-        self._count_since_flush += 1
-        if self.cfg.flush_every > 0 and self._count_since_flush >= self.cfg.flush_every:
-            self._fh.flush()
-            self._count_since_flush = 0
+        if ts_utc:
+            self._append(states, ts_utc)
+        else:
+            self._append_us(time.time_ns() // 1000, states)
+        self._maybe_flush()
+
+    def write_many(self, samples: Iterable[Tuple[int, PinStates]]) -> None:
+        """Writes a batch of (ts_us, states) samples, ts_us being epoch microseconds."""
+        if self._fd is None:
+            raise RuntimeError("JSON logger is not open. Call open() first.")
+        for ts_us, states in samples:
+            self._append_us(ts_us, states)
+        self._maybe_flush()
+
+    def _append_us(self, ts_us: int, states: PinStates) -> None:
+        if encode_sample is not None:
+            self._buf += encode_sample(ts_us, states.mask)
+        else:
+            self._append(states, self.iso_utc(ts_us))
+
+    def _append(self, states: PinStates, ts: str) -> None:
+        if not (ts.isascii() and ts.isprintable()) or '"' in ts or "\\" in ts:
+            # caller-supplied timestamp that can't be pasted between quotes as-is:
+            # let the general encoder escape it
+            rec = {"ts_utc": ts, "d4": states.d4, "d5": states.d5, "d6": states.d6, "d7": states.d7}
+            self._buf += _dumps(rec) + b"\n"
+            return
+        buf = self._buf
+        buf += _PREFIX
+        buf += ts.encode("ascii")
+        buf += _TAILS[states.mask]
+
+    def _maybe_flush(self) -> None:
+        if (
+            len(self._buf) >= self.cfg.buffer_bytes
+            or time.monotonic() - self._last_flush >= self.cfg.flush_interval_s
+        ):
+            self.flush()
@@ -8,9 +8,12 @@ def main():
             port="COM3",
             baud=115200,
             json_path="pin_samples.ndjson",
-            flush_every=1,
+            flush_interval_s=0.5,
+            fsync_interval_s=5.0,
             poll_sleep_s=0.0,
             print_errors=True,
+            on_change_only=True,
+            heartbeat_s=5.0,
         )
     )
     svc.start()
@@ -19,6 +19,7 @@ def print_status(status: Dict[str, Any]) -> None:
     print(f"Last sample age: {_fmt_seconds(status['last_sample_age_s'])}")
     print(f"Samples written: {status['samples_written']}")
     print(f"Bad reads:       {status['bad_reads']}")
+    print(f"Unchanged skips: {status['duplicates_suppressed']}")
     print(f"Last error:      {status['last_error'] or 'none'}")
     pins = status["pins"]
     print(f"Pins:            D4={pins['d4']} D5={pins['d5']} D6={pins['d6']} D7={pins['d7']}")
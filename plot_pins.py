@@ -2,114 +2,154 @@ from __future__ import annotations
 
 import argparse
 import json
-from dataclasses import dataclass
-from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional, Tuple
+import mmap
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
 
+import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used when orjson is not installed
+    orjson = None
 
-@dataclass(frozen=True)
-class Sample:
-    t: datetime
-    d4: Optional[int]
-    d5: Optional[int]
-    d6: Optional[int]
-    d7: Optional[int]
+_loads = orjson.loads if orjson is not None else json.loads
 
+PINS = ("d4", "d5", "d6", "d7")
 
-def _parse_ts(ts: str) -> datetime:
+# Columnar samples: "t" is datetime64[us] (UTC), "d4".."d7" are int8 with -1 for missing.
+Samples = Dict[str, np.ndarray]
+
+
+def _parse_ts(ts: str) -> np.datetime64:
     # Handles "2026-01-13T04:32:10.123456Z" or "+00:00"
     if ts.endswith("Z"):
-        ts = ts[:-1] + "+00:00"
-    return datetime.fromisoformat(ts).astimezone(timezone.utc)
+        # the logger's own format: numpy parses it directly once the "Z" is dropped
+        return np.datetime64(ts[:-1], "us")
+    t = datetime.fromisoformat(ts).astimezone(timezone.utc)
+    return np.datetime64(t.replace(tzinfo=None), "us")
+
+
+def _count_lines(mm: mmap.mmap) -> int:
+    buf = np.frombuffer(mm, dtype=np.uint8)
+    n = int(np.count_nonzero(buf == ord("\n")))
+    if buf[-1] != ord("\n"):
+        n += 1  # last line without trailing newline
+    del buf  # release the export before the mmap closes
+    return n
+
+
+def _empty_samples() -> Samples:
+    return {"t": np.empty(0, dtype="datetime64[us]"), **{k: np.empty(0, dtype=np.int8) for k in PINS}}
 
 
-def read_ndjson(path: str, since_seconds: Optional[int] = None) -> List[Sample]:
+def read_ndjson(path: str, since_seconds: Optional[int] = None) -> Samples:
     """
-    Reads NDJSON file into a list of Sample.
+    Reads NDJSON file into columnar arrays (see Samples), sorted by time.
     If since_seconds is set, filters to only keep samples newer than (now - since_seconds).
     """
-    cutoff: Optional[datetime] = None
-    if since_seconds is not None:
-        cutoff = datetime.now(timezone.utc) - timedelta(seconds=since_seconds)
-
-    out: List[Sample] = []
-    with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                rec = json.loads(line)
-                t = _parse_ts(rec["ts_utc"])
-                if cutoff and t < cutoff:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return _empty_samples()  # mmap can't map an empty file
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            n = _count_lines(mm)
+            t = np.empty(n, dtype="datetime64[us]")
+            cols = {k: np.full(n, -1, dtype=np.int8) for k in PINS}
+
+            # walk the mapping newline to newline; lines go to the parser as raw bytes
+            i = 0
+            pos = 0
+            size = len(mm)
+            while pos < size:
+                nl = mm.find(b"\n", pos)
+                if nl < 0:
+                    nl = size
+                line = mm[pos:nl]
+                pos = nl + 1
+                if not line or line.isspace():
+                    continue
+                try:
+                    rec = _loads(line)
+                    t[i] = _parse_ts(rec["ts_utc"])
+                    for k in PINS:
+                        v = rec.get(k)
+                        cols[k][i] = -1 if v is None else v
+                except Exception:
+                    # ignore malformed lines
                     continue
-                out.append(
-                    Sample(
-                        t=t,
-                        d4=rec.get("d4"),
-                        d5=rec.get("d5"),
-                        d6=rec.get("d6"),
-                        d7=rec.get("d7"),
-                    )
-                )
-            except Exception:
-                # ignore malformed lines
-                continue
-
-    out.sort(key=lambda s: s.t)
-    return out
-
-
-def downsample(samples: List[Sample], max_points: int) -> List[Sample]:
+                i += 1
+
+    out: Samples = {"t": t[:i], **{k: v[:i] for k, v in cols.items()}}
+
+    if since_seconds is not None:
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+        keep = out["t"] >= now - np.timedelta64(since_seconds, "s")
+        out = {k: v[keep] for k, v in out.items()}
+
+    order = np.argsort(out["t"], kind="stable")
+    return {k: v[order] for k, v in out.items()}
+
+
+def downsample(samples: Samples, max_points: int) -> Samples:
     """
     Simple downsample: keep at most max_points evenly spaced samples.
     Good enough for plotting huge logs quickly.
     """
-    n = len(samples)
+    n = samples["t"].size
     if max_points <= 0 or n <= max_points:
         return samples
-    step = n / max_points
-    idx = [int(i * step) for i in range(max_points)]
-    # ensure last point is included
-    if idx[-1] != n - 1:
-        idx[-1] = n - 1
-    return [samples[i] for i in idx]
-
-
-def _series(samples: List[Sample], attr: str) -> Tuple[List[datetime], List[float]]:
-    xs: List[datetime] = []
-    ys: List[float] = []
-    for s in samples:
-        v = getattr(s, attr)
-        if v is None:
-            continue
-        xs.append(s.t)
-        ys.append(float(v))
-    return xs, ys
+    # evenly spaced; keeps the first and last point once max_points >= 2 (1 keeps only the first)
+    idx = np.linspace(0, n - 1, max_points).astype(np.int64)
+    return {k: v[idx] for k, v in samples.items()}
+
+
+def _series(samples: Samples, attr: str) -> Tuple[np.ndarray, np.ndarray]:
+    present = samples[attr] >= 0
+    return samples["t"][present], samples[attr][present].astype(float)
 
 
-def plot_digital_traces(samples: List[Sample], title: str = "Pin States") -> None:
+def _step_post(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    # vertices of step(where="post"): hold each value until the next sample
+    return np.column_stack([np.repeat(xs, 2)[1:], np.repeat(ys, 2)[:-1]])
+
+
+def plot_digital_traces(samples: Samples, title: str = "Pin States") -> None:
     """
     Clean and neat plot:
     - 4 traces with vertical offsets so they don't overlap
-    - step plot for digital signals
+    - step plot for digital signals, drawn as one LineCollection
     """
-    if not samples:
+    if samples["t"].size == 0:
         print("No samples to plot.")
         return
 
     pins = [("d4", 0.0), ("d5", 1.5), ("d6", 3.0), ("d7", 4.5)]
     labels = {"d4": "D4", "d5": "D5", "d6": "D6", "d7": "D7"}
 
+    colors = plt.rcParams["axes.prop_cycle"].by_key()["color"]
+
     plt.figure()
-    for attr, offset in pins:
+    ax = plt.gca()
+    segs = []
+    seg_colors = []
+    handles = []
+    for i, (attr, offset) in enumerate(pins):
         xs, ys = _series(samples, attr)
-        if not xs:
+        if not xs.size:
             continue
-        ys_off = [y + offset for y in ys]
-        plt.step(xs, ys_off, where="post", label=labels[attr])
+        color = colors[i % len(colors)]
+        segs.append(_step_post(mdates.date2num(xs), ys + offset))
+        seg_colors.append(color)
+        handles.append(Line2D([], [], color=color, label=labels[attr]))
+
+    ax.add_collection(LineCollection(segs, colors=seg_colors))
+    ax.xaxis_date()
+    ax.autoscale_view()
 
     # y ticks that read nicely
     yticks = []
@@ -122,7 +162,7 @@ def plot_digital_traces(samples: List[Sample], title: str = "Pin States") -> Non
     plt.xlabel("Time (UTC)")
     plt.title(title)
     plt.grid(True)
-    plt.legend(loc="upper right")
+    plt.legend(handles=handles, loc="upper right")
     plt.tight_layout()
     plt.show()
 
@@ -137,9 +177,9 @@ def main():
     samples = read_ndjson(args.file, since_seconds=args.since)
     samples = downsample(samples, max_points=args.max_points)
 
-    if samples:
-        t0, t1 = samples[0].t, samples[-1].t
-        title = f"Pin States (UTC)  {t0.isoformat().replace('+00:00','Z')}  →  {t1.isoformat().replace('+00:00','Z')}"
+    if samples["t"].size:
+        t0, t1 = samples["t"][0], samples["t"][-1]
+        title = f"Pin States (UTC)  {np.datetime_as_string(t0)}Z  →  {np.datetime_as_string(t1)}Z"
     else:
         title = "Pin States"
 
@@ -1,40 +1,80 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Optional
 
 import serial
 
 
-def parse_line(line: str) -> Dict[int, int]:
-    parts = [p.strip() for p in line.split(",") if p.strip() != ""]
-    if len(parts) % 2 != 0:
-        raise ValueError(f"Odd number of CSV fields: {parts}")
+FIRST_PIN = 4
+LAST_PIN = 7
+
+MAX_LINE_BYTES = 1024  # longer runs without a newline are treated as line noise and dropped
+
+
+def parse_line(line: str) -> int:
+    """
+    Parses "pin,value,pin,value,..." into a PinStates mask.
+    Pins outside D4..D7 are ignored; values must be 0 or 1.
+    """
+    mask = 0
+    pin: Optional[int] = None
+    n = len(line)
+    i = 0
+    # single walk over the fields; int() tolerates the surrounding whitespace
+    while i <= n:
+        c = line.find(",", i)
+        if c < 0:
+            c = n
+        field = line[i:c]
+        i = c + 1
+        if not field or field.isspace():
+            continue
+        if pin is None:
+            pin = int(field)
+            continue
+        val = int(field)
+        if FIRST_PIN <= pin <= LAST_PIN:
+            if val not in (0, 1):
+                raise ValueError(f"Pin {pin} value out of range: {val}")
+            bit = pin - FIRST_PIN
+            mask = (mask & ~(0x11 << bit)) | ((0x10 | val) << bit)
+        pin = None
+
+    if pin is not None:
+        raise ValueError(f"Odd number of CSV fields: {line!r}")
+    return mask
 
-    out: Dict[int, int] = {}
-    for i in range(0, len(parts), 2):
-        pin = int(parts[i])
-        val = int(parts[i + 1])
-        out[pin] = val
-    return out
 
-
-@dataclass(frozen=True)
 class PinStates:
-    states: Dict[int, int]
+    """
+    D4..D7 packed into one byte:
+      bits 0..3  value of D4..D7
+      bits 4..7  set when the pin was present in the frame (else the value is None)
+    """
+
+    __slots__ = ("mask",)
+
+    def __init__(self, mask: int) -> None:
+        self.mask = mask
+
+    def __repr__(self) -> str:
+        return f"PinStates(d4={self.d4}, d5={self.d5}, d6={self.d6}, d7={self.d7})"
 
     def get(self, pin: int, default: Optional[int] = None) -> Optional[int]:
-        return self.states.get(pin, default)
+        bit = pin - FIRST_PIN
+        if 0 <= bit <= LAST_PIN - FIRST_PIN and self.mask & (0x10 << bit):
+            return (self.mask >> bit) & 1
+        return default
 
     @property
-    def d4(self) -> Optional[int]: return self.states.get(4)
+    def d4(self) -> Optional[int]: return self.mask & 1 if self.mask & 0x10 else None
     @property
-    def d5(self) -> Optional[int]: return self.states.get(5)
+    def d5(self) -> Optional[int]: return (self.mask >> 1) & 1 if self.mask & 0x20 else None
     @property
-    def d6(self) -> Optional[int]: return self.states.get(6)
+    def d6(self) -> Optional[int]: return (self.mask >> 2) & 1 if self.mask & 0x40 else None
     @property
-    def d7(self) -> Optional[int]: return self.states.get(7)
+    def d7(self) -> Optional[int]: return (self.mask >> 3) & 1 if self.mask & 0x80 else None
 
 
 class ArduinoPinMonitor:
@@ -52,11 +92,13 @@ class ArduinoPinMonitor:
         self.startup_delay = startup_delay
         self.reset_input_buffer_on_open = reset_input_buffer
         self._ser: Optional[serial.Serial] = None
+        self._inbuf = bytearray()
 
     def open(self) -> None:
         if self._ser and self._ser.is_open:
             return
         self._ser = serial.Serial(self.port, self.baud, timeout=self.timeout)
+        self._inbuf.clear()
         if self.startup_delay > 0:
             time.sleep(self.startup_delay)
         if self.reset_input_buffer_on_open:
@@ -71,6 +113,7 @@ class ArduinoPinMonitor:
                 self._ser.close()
             finally:
                 self._ser = None
+                self._inbuf.clear()
 
     def __enter__(self) -> "ArduinoPinMonitor":
         self.open()
@@ -79,13 +122,30 @@ class ArduinoPinMonitor:
     def __exit__(self, exc_type, exc, tb) -> None:
         self.close()
 
+    def has_buffered_line(self) -> bool:
+        """True if the next read_states() can be served from the buffer without touching the port."""
+        return b"\n" in self._inbuf
+
     def read_states(self) -> Optional[PinStates]:
         if not self._ser or not self._ser.is_open:
             raise RuntimeError("Serial port is not open. Call open() first.")
 
-        raw = self._ser.readline()
-        if not raw:
-            return None
+        # Pull whatever is waiting in one read and split lines out of our own buffer,
+        # instead of readline()'s byte-at-a-time reads.
+        nl = self._inbuf.find(b"\n")
+        while nl < 0:
+            data = self._ser.read(max(1, self._ser.in_waiting))
+            if not data:
+                return None  # timeout; keep any partial line for the next call
+            start = len(self._inbuf)
+            self._inbuf += data
+            nl = self._inbuf.find(b"\n", start)
+            if nl < 0 and len(self._inbuf) > MAX_LINE_BYTES:
+                # no newline anywhere in the buffer, so this is all one runaway line
+                del self._inbuf[:-MAX_LINE_BYTES]
+
+        raw = bytes(self._inbuf[:nl])
+        del self._inbuf[: nl + 1]
 
         line = raw.decode("utf-8", errors="replace").strip()
         if not line:
@@ -1,28 +1,95 @@
 from __future__ import annotations
 
+import array
+import asyncio
 import threading
 import time
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 from serial_reader import ArduinoPinMonitor, PinStates
 from json_logger import PinSampleJSONLogger, JSONLogConfig
 
 
+_FLUSH = object()  # writer queue marker: flush the logger, nothing to write
+
+
 @dataclass(frozen=True)
 class PinLoggingServiceConfig:
     port: str
     baud: int = 115200
     json_path: str = "pin_samples.ndjson"
-    flush_every: int = 1
+    buffer_bytes: int = 65536
+    flush_interval_s: float = 0.5
+    fsync_interval_s: float = 5.0
     poll_sleep_s: float = 0.0
     print_errors: bool = False
+    # only log a sample when the pins change, plus one every heartbeat_s while they don't
+    on_change_only: bool = False
+    heartbeat_s: float = 5.0
+    # reader -> writer pipeline (the queue holds batches of up to write_batch samples)
+    queue_size: int = 64
+    write_batch: int = 256
+
+
+class SampleRing:
+    """
+    Fixed-size ring of recent samples, written by one thread and read by any.
+
+    Each record is two u64 slots: (ts_us, seq << 8 | mask), guarded like a seqlock.
+    The writer first marks the tag busy, then stores ts_us, then the final tag, and
+    publishes the record by bumping head. Readers load tag, ts_us, tag again and
+    reject the record unless both tags match the expected seq, so a record that is
+    overwritten mid-read is dropped rather than returned half old, half new.
+    No locks, no per-sample allocation.
+    """
+
+    def __init__(self, size: int = 2048) -> None:
+        if size <= 0 or size & (size - 1):
+            raise ValueError(f"ring size must be a power of two: {size}")
+        self._mask = size - 1
+        self._slots = array.array("Q", bytes(16 * size))
+        self._head = 0
+
+    _BUSY = 0xFFFF_FFFF_FFFF_FFFF  # tag while a record is being rewritten; matches no seq
+
+    def push(self, ts_us: int, mask: int) -> None:
+        seq = self._head
+        j = (seq & self._mask) << 1
+        self._slots[j + 1] = self._BUSY
+        self._slots[j] = ts_us
+        self._slots[j + 1] = (seq << 8) | mask
+        self._head = seq + 1
+
+    def _read(self, seq: int) -> Optional[Tuple[int, int]]:
+        j = (seq & self._mask) << 1
+        tag = self._slots[j + 1]
+        ts_us = self._slots[j]
+        if tag >> 8 != seq or self._slots[j + 1] != tag:
+            return None  # overwritten (or being overwritten) by the writer
+        return ts_us, tag & 0xFF
+
+    def latest(self) -> Optional[Tuple[int, int]]:
+        head = self._head
+        return self._read(head - 1) if head else None
+
+    def recent(self, n: int) -> List[Tuple[int, int]]:
+        """Up to n most recent (ts_us, mask) records, oldest first."""
+        head = self._head
+        n = min(n, head, self._mask + 1)
+        out = [self._read(seq) for seq in range(head - n, head)]
+        return [r for r in out if r is not None]
 
 
 class PinLoggingService:
     """
     Background thread: serial -> json log.
     Also tracks simple runtime status for UI/menu.
+
+    The thread runs an asyncio pipeline: one task reads the serial port (in an
+    executor thread, a chunk of frames per call) and queues sample batches, another
+    drains the queue and writes them to the log (also off-loop), so a slow disk
+    doesn't stall serial reads.
     """
 
     def __init__(self, cfg: PinLoggingServiceConfig) -> None:
@@ -30,14 +97,20 @@ class PinLoggingService:
         self._stop = threading.Event()
         self._thread: Optional[threading.Thread] = None
 
-        # --- status (protected by lock) ---
-        self._lock = threading.Lock()
+        # --- status ---
+        # Written only by the worker thread and read without locking: each field is a
+        # single attribute store, so readers may see a slightly stale but never torn value.
         self._running: bool = False
-        self._started_at: Optional[float] = None
-        self._last_sample_at: Optional[float] = None
-        self._last_states: Optional[PinStates] = None
+        # ages/durations use time.monotonic_ns(), immune to NTP steps
+        self._started_at_ns: Optional[int] = None  # time.monotonic_ns()
+        self._last_sample_at_ns: Optional[int] = None  # time.monotonic_ns()
+        self._recent = SampleRing()
         self._samples_written: int = 0
         self._bad_reads: int = 0
+        self._duplicates_suppressed: int = 0
+        # the one field that isn't a plain counter/reference bump: keep it behind a
+        # short critical section (get_status/_set_error only, never the sample path)
+        self._error_lock = threading.Lock()
         self._last_error: Optional[str] = None
 
     def start(self) -> None:
@@ -51,88 +124,179 @@ class PinLoggingService:
         self._stop.set()
         if self._thread:
             self._thread.join(timeout=2.0)
-        with self._lock:
-            self._running = False
 
     def is_running(self) -> bool:
         return bool(self._thread and self._thread.is_alive())
 
     def get_status(self) -> Dict[str, Any]:
         """
-        Safe snapshot for menu/UI.
-        Times are epoch seconds (time.time()) and also computed uptime.
+        Snapshot for menu/UI. Counters and pins are read without locking and may lag
+        the worker by a sample; only last_error takes a (short) lock.
+        Uptime and last sample age are in seconds, from a monotonic clock.
         """
-        with self._lock:
-            now = time.time()
-            uptime_s = (now - self._started_at) if self._started_at else None
-            last = self._last_states
-
-            return {
-                "running": self.is_running(),
-                "port": self.cfg.port,
-                "baud": self.cfg.baud,
-                "json_path": self.cfg.json_path,
-                "uptime_s": uptime_s,
-                "last_sample_age_s": (now - self._last_sample_at) if self._last_sample_at else None,
-                "samples_written": self._samples_written,
-                "bad_reads": self._bad_reads,
-                "last_error": self._last_error,
-                "pins": {
-                    "d4": last.d4 if last else None,
-                    "d5": last.d5 if last else None,
-                    "d6": last.d6 if last else None,
-                    "d7": last.d7 if last else None,
-                },
-            }
-
-    def _set_error(self, msg: str) -> None:
-        with self._lock:
+        now_ns = time.monotonic_ns()
+        started_at_ns = self._started_at_ns
+        last_sample_at_ns = self._last_sample_at_ns
+        latest = self._recent.latest()
+        last = PinStates(latest[1]) if latest else None
+        with self._error_lock:
+            last_error = self._last_error
+
+        return {
+            "running": self.is_running(),
+            "port": self.cfg.port,
+            "baud": self.cfg.baud,
+            "json_path": self.cfg.json_path,
+            "uptime_s": (now_ns - started_at_ns) / 1e9 if started_at_ns is not None else None,
+            "last_sample_age_s": (now_ns - last_sample_at_ns) / 1e9 if last_sample_at_ns is not None else None,
+            "samples_written": self._samples_written,
+            "bad_reads": self._bad_reads,
+            "duplicates_suppressed": self._duplicates_suppressed,
+            "last_error": last_error,
+            "pins": {
+                "d4": last.d4 if last else None,
+                "d5": last.d5 if last else None,
+                "d6": last.d6 if last else None,
+                "d7": last.d7 if last else None,
+            },
+        }
+
+    def recent_samples(self, n: int = 10) -> List[Tuple[float, PinStates]]:
+        """Up to n most recent samples as (epoch seconds, states), oldest first."""
+        return [(ts_us / 1e6, PinStates(mask)) for ts_us, mask in self._recent.recent(n)]
+
+    def _set_error(self, msg: Optional[str]) -> None:
+        with self._error_lock:
             self._last_error = msg
 
     def _run(self) -> None:
-        logger = PinSampleJSONLogger(JSONLogConfig(path=self.cfg.json_path, flush_every=self.cfg.flush_every))
-
-        with self._lock:
-            self._running = True
-            self._started_at = time.time()
-            self._last_error = None
+        self._running = True
+        self._started_at_ns = time.monotonic_ns()
+        self._set_error(None)
 
         try:
-            logger.open()
-            with ArduinoPinMonitor(self.cfg.port, self.cfg.baud) as mon:
-                while not self._stop.is_set():
-                    states = mon.read_states()
-                    if states is None:
-                        with self._lock:
-                            self._bad_reads += 1
-                        if self.cfg.poll_sleep_s > 0:
-                            time.sleep(self.cfg.poll_sleep_s)
-                        continue
-
-                    with self._lock:
-                        self._last_states = states
-                        self._last_sample_at = time.time()
-
-                    try:
-                        logger.write_sample(states)
-                        with self._lock:
-                            self._samples_written += 1
-                    except Exception as e:
-                        self._set_error(f"JSON write error: {e}")
-                        if self.cfg.print_errors:
-                            print(f"[PinLoggingService] JSON write error: {e}")
-
-                    if self.cfg.poll_sleep_s > 0:
-                        time.sleep(self.cfg.poll_sleep_s)
-
+            asyncio.run(self._pipeline())
         except Exception as e:
             self._set_error(f"fatal: {e}")
             if self.cfg.print_errors:
                 print(f"[PinLoggingService] fatal: {e}")
+        finally:
+            self._running = False
+
+    async def _pipeline(self) -> None:
+        logger = PinSampleJSONLogger(
+            JSONLogConfig(
+                path=self.cfg.json_path,
+                buffer_bytes=self.cfg.buffer_bytes,
+                flush_interval_s=self.cfg.flush_interval_s,
+                fsync_interval_s=self.cfg.fsync_interval_s,
+            )
+        )
+        # items are lists of (ts_us, states), _FLUSH asks for an idle flush, None ends the stream
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.cfg.queue_size)
+
+        try:
+            logger.open()
+            with ArduinoPinMonitor(self.cfg.port, self.cfg.baud) as mon:
+                writer = asyncio.create_task(self._write_batches(queue, logger))
+                ticker = asyncio.create_task(self._flush_ticker(queue))
+                try:
+                    await self._read_samples(mon, queue)
+                finally:
+                    # let the writer drain what was already read before shutting down
+                    ticker.cancel()
+                    await queue.put(None)
+                    await writer
         finally:
             try:
                 logger.close()
             except Exception:
                 pass
-            with self._lock:
-                self._running = False
+
+    def _read_frames(self, mon: ArduinoPinMonitor) -> List[Tuple[Optional[PinStates], int]]:
+        # Runs in the executor. One blocking read, then whatever complete lines are already
+        # buffered (up to write_batch), so the executor round trip is paid per chunk, not
+        # per frame. Each frame is timestamped as soon as it is parsed.
+        frames = []
+        while True:
+            frames.append((mon.read_states(), time.time_ns() // 1000))
+            if len(frames) >= self.cfg.write_batch or not mon.has_buffered_line():
+                return frames
+
+    async def _read_samples(self, mon: ArduinoPinMonitor, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        last_mask = -1  # mask of the last sample queued for writing (-1 = none yet)
+        last_write_at_ns = 0
+        heartbeat_ns = int(self.cfg.heartbeat_s * 1e9)
+
+        while not self._stop.is_set():
+            frames = await loop.run_in_executor(None, self._read_frames, mon)
+            now_ns = time.monotonic_ns()
+            batch = []
+            for states, ts_us in frames:
+                if states is None:
+                    self._bad_reads += 1
+                    continue
+
+                self._last_sample_at_ns = now_ns
+                self._recent.push(ts_us, states.mask)
+
+                if (
+                    self.cfg.on_change_only
+                    and states.mask == last_mask
+                    and now_ns - last_write_at_ns < heartbeat_ns
+                ):
+                    self._duplicates_suppressed += 1
+                else:
+                    batch.append((ts_us, states))
+                    last_mask = states.mask
+                    last_write_at_ns = now_ns
+
+            if batch:
+                await queue.put(batch)
+
+            if self.cfg.poll_sleep_s > 0:
+                await asyncio.sleep(self.cfg.poll_sleep_s)
+
+    async def _flush_ticker(self, queue: asyncio.Queue) -> None:
+        # Without new samples the logger never gets to check flush_interval_s (e.g.
+        # on_change_only with static pins, or a quiet serial line), so ask the writer to
+        # flush on a fixed tick. Going through the queue keeps flushes ordered with writes.
+        if self.cfg.flush_interval_s <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.cfg.flush_interval_s)
+            if queue.empty():
+                queue.put_nowait(_FLUSH)
+
+    async def _write_batches(self, queue: asyncio.Queue, logger: PinSampleJSONLogger) -> None:
+        done = False
+        while not done:
+            item = await queue.get()
+            if item is None:
+                break
+            if item is _FLUSH:
+                await self._to_logger(logger.flush)
+                continue
+
+            batch = list(item)
+            while len(batch) < self.cfg.write_batch and not queue.empty():
+                item = queue.get_nowait()
+                if item is None:
+                    done = True
+                    break
+                if item is not _FLUSH:  # about to write anyway
+                    batch.extend(item)
+
+            if await self._to_logger(logger.write_many, batch):
+                self._samples_written += len(batch)
+
+    async def _to_logger(self, fn, *args) -> bool:
+        try:
+            await asyncio.to_thread(fn, *args)
+            return True
+        except Exception as e:
+            self._set_error(f"JSON write error: {e}")
+            if self.cfg.print_errors:
+                print(f"[PinLoggingService] JSON write error: {e}")
+            return False
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+_fastlog = pytest.importorskip("_fastlog")
+
+from json_logger import _PREFIX, _TAILS, PinSampleJSONLogger
+
+
+def _timestamps():
+    rng = random.Random(0)
+    fixed = [
+        0,
+        951_782_400_000_000,  # 2000-02-29 00:00:00
+        951_868_799_999_999,  # 2000-02-29 23:59:59.999999
+        1_709_208_000_123_456,  # 2024-02-29 12:00:00.123456
+        4_102_444_799_999_999,  # 2099-12-31 23:59:59.999999
+    ]
+    return fixed + [rng.randrange(4_102_444_800_000_000) for _ in range(200)]
+
+
+def test_encode_sample_matches_pure_python_path():
+    for ts_us in _timestamps():
+        ts = PinSampleJSONLogger.iso_utc(ts_us).encode()
+        for mask in range(256):
+            assert _fastlog.encode_sample(ts_us, mask) == _PREFIX + ts + _TAILS[mask], (ts_us, mask)
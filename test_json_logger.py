@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import errno
+import json
+import os
+
+import pytest
+
+import json_logger
+from json_logger import JSONLogConfig, PinSampleJSONLogger
+from serial_reader import PinStates
+
+
+def _logger(tmp_path) -> PinSampleJSONLogger:
+    cfg = JSONLogConfig(str(tmp_path / "pins.ndjson"), buffer_bytes=1 << 20, fsync_interval_s=0)
+    return PinSampleJSONLogger(cfg)
+
+
+def test_failed_flush_after_short_write_keeps_each_line_once(tmp_path, monkeypatch):
+    real_write = os.write
+    calls = []
+
+    def flaky_write(fd, data):
+        calls.append(len(data))
+        if len(calls) == 1:
+            return real_write(fd, bytes(data[: len(data) // 2 + 3]))  # short write, mid-line
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    samples = [(1_709_208_000_000_000 + i, PinStates(i & 0xFF)) for i in range(100)]
+    with _logger(tmp_path) as log:
+        log.write_many(samples)
+        monkeypatch.setattr(json_logger.os, "write", flaky_write)
+        with pytest.raises(OSError):
+            log.flush()
+        monkeypatch.setattr(json_logger.os, "write", real_write)
+    assert len(calls) == 2
+
+    with open(log.cfg.path, "rb") as f:
+        lines = f.read().splitlines()
+    expected = [
+        (PinSampleJSONLogger.iso_utc(ts), states.d4, states.d5, states.d6, states.d7)
+        for ts, states in samples
+    ]
+    got = [tuple(json.loads(line)[k] for k in ("ts_utc", "d4", "d5", "d6", "d7")) for line in lines]
+    assert got == expected
+
+
+def test_caller_timestamp_that_needs_escaping_stays_valid_json(tmp_path):
+    ts = 'a"b\\c\n'
+    with _logger(tmp_path) as log:
+        log.write_sample(PinStates(0x3F), ts_utc=ts)
+        log.write_sample(PinStates(0x3F), ts_utc="2024-02-29T12:00:00.000000Z")
+
+    with open(log.cfg.path, "rb") as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == {"ts_utc": ts, "d4": 1, "d5": 1, "d6": None, "d7": None}
+    assert json.loads(lines[1])["ts_utc"] == "2024-02-29T12:00:00.000000Z"
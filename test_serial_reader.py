@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from serial_reader import MAX_LINE_BYTES, ArduinoPinMonitor
+
+
+class FakeSerial:
+    """Stands in for serial.Serial: hands out a fixed byte backlog, then times out."""
+
+    is_open = True
+
+    def __init__(self, data: bytes) -> None:
+        self._data = bytearray(data)
+
+    @property
+    def in_waiting(self) -> int:
+        return len(self._data)
+
+    def read(self, n: int = 1) -> bytes:
+        out = bytes(self._data[:n])
+        del self._data[:n]
+        return out
+
+    def close(self) -> None:
+        self.is_open = False
+
+
+def _monitor(data: bytes) -> ArduinoPinMonitor:
+    mon = ArduinoPinMonitor("fake")
+    mon._ser = FakeSerial(data)
+    return mon
+
+
+def test_backlog_larger_than_max_line_keeps_every_frame():
+    frames = [f"4,{i % 2},5,1,6,0,7,0\n".encode() for i in range(200)]
+    backlog = b"".join(frames)
+    assert len(backlog) > MAX_LINE_BYTES
+
+    mon = _monitor(backlog)
+    got = []
+    while True:
+        states = mon.read_states()
+        if states is None:
+            break
+        got.append(states)
+
+    assert len(got) == len(frames)
+    assert [s.d4 for s in got] == [i % 2 for i in range(200)]
+    assert all((s.d5, s.d6, s.d7) == (1, 0, 0) for s in got)
+
+
+def test_runaway_line_without_newline_is_trimmed():
+    mon = _monitor(b"x" * (3 * MAX_LINE_BYTES) + b"\n4,1,5,0,6,1,7,0\n")
+    mon._ser.read = lambda n=1, _read=mon._ser.read: _read(min(n, 256))
+
+    # the noise line is dropped (parse fails), the real frame after it survives
+    assert mon.read_states() is None
+    assert len(mon._inbuf) <= MAX_LINE_BYTES + 256
+    states = mon.read_states()
+    assert (states.d4, states.d5, states.d6, states.d7) == (1, 0, 1, 0)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from services import SampleRing
+
+
+def test_ring_wraps_and_returns_recent_oldest_first():
+    ring = SampleRing(8)
+    assert ring.latest() is None
+    assert ring.recent(4) == []
+
+    for i in range(3):
+        ring.push(1000 + i, i)
+    assert ring.recent(10) == [(1000, 0), (1001, 1), (1002, 2)]
+
+    for i in range(3, 21):
+        ring.push(1000 + i, i)
+    assert ring.latest() == (1020, 20)
+    assert ring.recent(3) == [(1018, 18), (1019, 19), (1020, 20)]
+    assert ring.recent(100) == [(1000 + i, i) for i in range(13, 21)]
+
+
+def test_ring_rejects_non_power_of_two_size():
+    with pytest.raises(ValueError):
+        SampleRing(6)
+
+
+class _InterleavingSlots(list):
+    """Slots that let the writer overwrite a record between the reader's loads."""
+
+    def __init__(self, slots, ring, ts_index, ts_us, mask):
+        super().__init__(slots)
+        self._ring, self._ts_index, self._next = ring, ts_index, (ts_us, mask)
+
+    def __getitem__(self, i):
+        value = super().__getitem__(i)
+        if i == self._ts_index and self._next is not None:
+            ts_us, mask = self._next
+            self._next = None
+            self._ring.push(ts_us, mask)
+        return value
+
+
+def test_record_overwritten_mid_read_is_dropped():
+    ring = SampleRing(4)
+    for i in range(4):
+        ring.push(100 + i, i)
+    # reading seq 0: the writer wraps around and replaces it after the first tag load
+    ring._slots = _InterleavingSlots(ring._slots, ring, 0, 999, 0xAA)
+    assert ring.recent(4) == [(101, 1), (102, 2), (103, 3)]
+    assert ring.recent(4) == [(101, 1), (102, 2), (103, 3), (999, 0xAA)]